@@ -13,6 +13,7 @@ ALL_LANGUAGES = [
     IT_IT,
     PT_PT
 ]
+ALL_LANGUAGES_SET = frozenset(ALL_LANGUAGES)
 
 LANGUAGES_TO_DEEPL = {
     FR_FR: 'FR',
@@ -39,6 +40,12 @@ FILE_EXTS = ['.php', '.js', '.json', '.html']
 
 PLUGIN_INFO_JSON = 'plugin_info/info.json'
 
+DEEPL_BATCH_SIZE = 50
+DEEPL_BURST = 6
+DEEPL_CALLS_PER_SECOND = 10
+JSON_STREAMING_MIN_SIZE = 1024 * 1024
+PROCESS_POOL_MIN_FILES = 32
+
 PLUGIN_ROOT = 'plugin'
 CORE_ROOT = 'jeedom_core'
 TRANSLATIONS_FILES_PATH = 'core/i18n'
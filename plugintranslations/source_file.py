@@ -21,28 +21,40 @@ class SourceFile(object):
             self._logger.warning(f"  prompt added    : {text}")
             self._prompts[text] = Prompt(text)
 
+    def add_extracted_prompts(self, extracted: list[tuple[str, str | None]]):
+        for message, text in extracted:
+            self._logger.warning(message)
+            if text is not None:
+                self._add_prompt(text)
+
     def search_prompts(self):
-        content = self._file.read_text(encoding="UTF-8")
+        self.add_extracted_prompts(SourceFile.extract_prompts(self._file))
+
+    @staticmethod
+    def extract_prompts(file: Path) -> list[tuple[str, str | None]]:
+        # return (message to log, prompt text found or None) so that logging can be done by the caller in file order
+        extracted = []
+        content = file.read_text(encoding="UTF-8")
         for txt in re.findall("{{(.*?)}}", content):
             if len(txt) != 0:
-                self._logger.warning(f"  add   accolade  : {txt}")
-                self._add_prompt(txt)
+                extracted.append((f"  add   accolade  : {txt}", txt))
             else:
-                self._logger.warning(f"There is an empty text in <{self._file.as_posix()}>")
+                extracted.append((f"There is an empty text in <{file.as_posix()}>", None))
 
-        if self._file.suffix == ".php":
+        if file.suffix == ".php":
             pattern = re.compile(r'__\s*\(\s*((?P<separator>["\'])(?P<text>.*?)(?P=separator))\s*,\s*\S+\s*\)')
             for match in pattern.finditer(content):
                 text = match.group('text')
                 separator = match.group('separator')
                 regex = r'(^' + separator + r')|([^\\]' + separator + r')'
                 if re.search(regex, text):
-                    self._logger.warning("====  String separator found in text !!!")
-                    self._logger.warning(f"      Fichier: {self._file.as_uri()}")
-                    self._logger.warning(f"      texte  : {text}")
+                    extracted.append(("====  String separator found in text !!!", None))
+                    extracted.append((f"      Fichier: {file.as_uri()}", None))
+                    extracted.append((f"      texte  : {text}", None))
                 else:
-                    self._logger.warning(f"  add   __  : {text}")
-                    self._add_prompt(text)
+                    extracted.append((f"  add   __  : {text}", text))
+
+        return extracted
 
     def get_prompts_and_translation(self, language: str, include_empty_translation: bool = False) -> dict[str, str]:
         result = {}
@@ -1,15 +1,21 @@
+import hashlib
 import json
 import os
 from pathlib import Path
+from types import SimpleNamespace
+import deepl
 import pytest
 
+from plugintranslations import translator
 from plugintranslations.translator import PluginTranslator
 from plugintranslations.consts import (
     EN_US,
     FR_FR,
     ES_ES,
     DE_DE,
+    IT_IT,
     PLUGIN_ROOT,
+    INPUT_DEEPL_API_KEY,
     INPUT_SOURCE_LANGUAGE,
     INPUT_TARGET_LANGUAGES,
     INPUT_INCLUDE_EMPTY_TRANSLATION,
@@ -20,6 +26,32 @@ from plugintranslations.consts import (
 )
 
 
+class FakeDeeplTranslator():
+
+    def __init__(self) -> None:
+        self.translate_calls: list[tuple[str, list[str]]] = []
+        self.glossaries = []
+        self.created_glossaries = []
+        self.deleted_glossaries = []
+
+    def list_glossaries(self):
+        return self.glossaries
+
+    def create_glossary(self, name, source_lang, target_lang, entries):
+        self.created_glossaries.append(name)
+        return SimpleNamespace(name=name, source_lang=source_lang, target_lang=target_lang)
+
+    def delete_glossary(self, glossary):
+        self.deleted_glossaries.append(glossary.name)
+
+    def translate_text(self, text, source_lang, target_lang, **kwargs):
+        self.translate_calls.append((target_lang, list(text)))
+        return [deepl.TextResult(f"{target_lang}:{t}", source_lang, len(t)) for t in text]
+
+    def close(self):
+        pass
+
+
 class TestPluginTranslator():
     # Arrange
     @pytest.fixture(scope="session", autouse=True)
@@ -50,6 +82,20 @@ class TestPluginTranslator():
         info_json_file = plugin_info_root/'info.json'
         info_json_file.write_text(json.dumps(info_json_content, ensure_ascii=False, indent='\t'), encoding="UTF-8")
 
+    @pytest.fixture
+    def fake_deepl(self, monkeypatch) -> FakeDeeplTranslator:
+        fake_translator = FakeDeeplTranslator()
+        monkeypatch.setenv(INPUT_DEEPL_API_KEY, 'fake_key')
+        monkeypatch.setattr(deepl, "Translator", lambda auth_key, **kwargs: fake_translator)
+        return fake_translator
+
+    @pytest.fixture
+    def plugin_tree(self, tmp_path) -> Path:
+        plugin_root = tmp_path/PLUGIN_ROOT
+        (plugin_root/"plugin_info").mkdir(parents=True)
+        (plugin_root/"plugin_info"/"info.json").write_text(json.dumps({'id': 'fake_plugin'}), encoding="UTF-8")
+        return plugin_root
+
     def test_init(self, current_working_dir):
         self._test_translate = PluginTranslator(current_working_dir)
         assert self._test_translate is not None
@@ -68,3 +114,151 @@ class TestPluginTranslator():
         self._test_translate.get_plugin_translations()
         # Assert
         assert 1
+
+    def test_invalid_target_language(self, current_working_dir):
+        # Arrange
+        os.environ[INPUT_TARGET_LANGUAGES] = f'{EN_US},xx_XX'
+
+        # Act & Assert
+        with pytest.raises(ValueError, match='xx_XX'):
+            PluginTranslator(current_working_dir)
+
+    def test_info_json_not_rewritten_when_unchanged(self, current_working_dir):
+        # Arrange
+        info_json_file = self.__plugin_root/"plugin_info"/"info.json"
+        PluginTranslator(current_working_dir).start()
+        os.utime(info_json_file, ns=(0, 0))
+
+        # Act
+        PluginTranslator(current_working_dir).start()
+
+        # Assert
+        assert info_json_file.stat().st_mtime_ns == 0
+
+    def test_iter_translations_file_streaming(self, tmp_path, monkeypatch):
+        # Arrange
+        pytest.importorskip("ijson")
+        translations = {
+            "plugins/fake_plugin/core/php/fake.php": {"Bonjour": "Hello", "Merci": "Thanks"},
+            "plugins/fake_plugin/desktop/js/fake.js": {"Oui": "Yes"}
+        }
+        translation_file = tmp_path/f"{EN_US}.json"
+        translation_file.write_text(json.dumps(translations, ensure_ascii=False, indent=4), encoding="UTF-8")
+        monkeypatch.setattr(translator, "JSON_STREAMING_MIN_SIZE", 0)
+
+        # Act
+        result = dict(translator._iter_translations_file(translation_file))
+
+        # Assert
+        assert result == translations
+
+    def test_find_prompts_with_process_pool(self, plugin_tree, monkeypatch, caplog):
+        # Arrange
+        (plugin_tree/"desktop"/"php").mkdir(parents=True)
+        for i in range(4):
+            (plugin_tree/"desktop"/"php"/f"fake{i}.php").write_text(f"<?php echo __('Texte {i}', __FILE__); ?>", encoding="UTF-8")
+        os.environ[INPUT_INCLUDE_EMPTY_TRANSLATION] = 'True'
+        monkeypatch.setattr(translator, "PROCESS_POOL_MIN_FILES", 2)
+
+        # Act
+        PluginTranslator(plugin_tree.parent).start()
+
+        # Assert
+        translation_file = plugin_tree/TRANSLATIONS_FILES_PATH/f"{EN_US}.json"
+        result = json.loads(translation_file.read_text(encoding="UTF-8"))
+        assert result == {f"plugins/fake_plugin/desktop/php/fake{i}.php": {f"Texte {i}": ""} for i in range(4)}
+        for i in range(4):
+            # messages of each file are logged right after its name
+            header_index = caplog.messages.index(f"    plugins/fake_plugin/desktop/php/fake{i}.php...")
+            assert caplog.messages[header_index + 1] == f"  add   __  : Texte {i}"
+
+    def test_invalid_boolean_input(self, current_working_dir):
+        # Arrange
+        os.environ[INPUT_DEBUG] = 'yes'
+
+        # Act & Assert
+        with pytest.raises(ValueError, match=INPUT_DEBUG):
+            PluginTranslator(current_working_dir)
+
+    def test_info_json_languages_order_kept(self, current_working_dir):
+        # Arrange
+        info_json_file = self.__plugin_root/"plugin_info"/"info.json"
+        os.environ[INPUT_TARGET_LANGUAGES] = f'{DE_DE},{EN_US},{IT_IT}'
+
+        # Act
+        PluginTranslator(current_working_dir).start()
+
+        # Assert
+        info_json_content = json.loads(info_json_file.read_text(encoding="UTF-8"))
+        assert info_json_content['language'] == [FR_FR, EN_US, DE_DE, IT_IT]
+
+    def test_existing_glossary_reused(self, current_working_dir, monkeypatch, fake_deepl):
+        # Arrange
+        glossary_file = Path(translator.__file__).parent/f"{FR_FR}_glossary.json"
+        md5_hash = hashlib.md5(glossary_file.read_bytes()).hexdigest()
+        fake_deepl.glossaries = [SimpleNamespace(name=md5_hash, source_lang='FR', target_lang='EN')]
+        os.environ[INPUT_TARGET_LANGUAGES] = EN_US
+        plugin_translator = PluginTranslator(current_working_dir)
+
+        def fail_json_loads(content):
+            raise AssertionError("glossary entries should not be parsed")
+        monkeypatch.setattr(translator, "_json_loads", fail_json_loads)
+
+        # Act
+        deepl_translator = plugin_translator.deepl_translator
+
+        # Assert
+        assert deepl_translator is fake_deepl
+        assert fake_deepl.created_glossaries == []
+        assert fake_deepl.deleted_glossaries == []
+
+    def test_streamed_translations_file_partially_loaded(self, plugin_tree, monkeypatch, caplog):
+        # Arrange
+        pytest.importorskip("ijson")
+        translation_path = plugin_tree/TRANSLATIONS_FILES_PATH
+        translation_path.mkdir(parents=True)
+        (translation_path/f"{EN_US}.json").write_text('{"a": {"Bonjour": "Hello"}, "b": {', encoding="UTF-8")
+        monkeypatch.setattr(translator, "JSON_STREAMING_MIN_SIZE", 0)
+
+        # Act
+        PluginTranslator(plugin_tree.parent).get_plugin_translations()
+
+        # Assert
+        assert "translations of the first 1 paths are kept" in caplog.text
+
+    def test_do_translate_with_deepl(self, plugin_tree, monkeypatch, fake_deepl):
+        # Arrange
+        (plugin_tree/"desktop"/"php").mkdir(parents=True)
+        (plugin_tree/"desktop"/"js").mkdir(parents=True)
+        (plugin_tree/"desktop"/"php"/"fake.php").write_text("<?php __('Bonjour', __FILE__); __('Merci', __FILE__); __('Oui', __FILE__); ?>", encoding="UTF-8")
+        (plugin_tree/"desktop"/"js"/"fake.js").write_text("{{Bonjour}} {{Oui}} {{Non}}", encoding="UTF-8")
+        translation_path = plugin_tree/TRANSLATIONS_FILES_PATH
+        translation_path.mkdir(parents=True)
+        existing_translations = {"plugins/fake_plugin/desktop/php/fake.php": {"Bonjour": "Hello", "Merci": ""}}
+        (translation_path/f"{EN_US}.json").write_text(json.dumps(existing_translations), encoding="UTF-8")
+        os.environ[INPUT_TARGET_LANGUAGES] = f'{EN_US},{ES_ES}'
+        monkeypatch.setattr(translator, "DEEPL_BATCH_SIZE", 2)
+
+        # Act
+        PluginTranslator(plugin_tree.parent).start()
+
+        # Assert
+        calls = {}
+        for target_lang, texts in fake_deepl.translate_calls:
+            calls.setdefault(target_lang, []).append(texts)
+        assert sorted(len(texts) for texts in calls['EN-US']) == [1, 2]
+        assert sorted(text for texts in calls['EN-US'] for text in texts) == ['Merci', 'Non', 'Oui']
+        assert sorted(len(texts) for texts in calls['ES']) == [2, 2]
+        assert sorted(text for texts in calls['ES'] for text in texts) == ['Bonjour', 'Merci', 'Non', 'Oui']
+        assert len(fake_deepl.translate_calls) == 4
+
+        en_us = json.loads((translation_path/f"{EN_US}.json").read_text(encoding="UTF-8"))
+        assert en_us == {
+            "plugins/fake_plugin/desktop/php/fake.php": {"Bonjour": "Hello", "Merci": "EN-US:Merci", "Oui": "EN-US:Oui"},
+            "plugins/fake_plugin/desktop/js/fake.js": {"Bonjour": "Hello", "Oui": "EN-US:Oui", "Non": "EN-US:Non"}
+        }
+        es_es = json.loads((translation_path/f"{ES_ES}.json").read_text(encoding="UTF-8"))
+        assert es_es == {
+            "plugins/fake_plugin/desktop/php/fake.php": {"Bonjour": "ES:Bonjour", "Merci": "ES:Merci", "Oui": "ES:Oui"},
+            "plugins/fake_plugin/desktop/js/fake.js": {"Bonjour": "ES:Bonjour", "Oui": "ES:Oui", "Non": "ES:Non"}
+        }
@@ -1,4 +1,5 @@
 import time
+import threading
 import pytest
 from plugintranslations.throttle import Throttle
 
@@ -26,3 +27,31 @@ class TestThrottle():
         elapsed = end - start
         assert elapsed >= seconds_to_wait * (max_calls - 1), f"Elapsed time {elapsed} should be at least {seconds_to_wait * (max_calls - 1)} seconds"
         assert count == max_calls, f"Function should be called {max_calls} times"
+
+    def test_call_from_threads(self):
+
+        seconds_to_wait = 0.05
+        nb_threads = 4
+        calls_per_thread = 3
+        results = []
+
+        @Throttle(seconds=seconds_to_wait)
+        def test_function():
+            results.append("Function executed")
+
+        def worker():
+            for _ in range(calls_per_thread):
+                test_function()
+
+        threads = [threading.Thread(target=worker) for _ in range(nb_threads)]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        end = time.monotonic()
+
+        max_calls = nb_threads * calls_per_thread
+        assert len(results) == max_calls, f"Function should be called {max_calls} times"
+        elapsed = end - start
+        assert elapsed >= seconds_to_wait * (max_calls - 1), f"Elapsed time {elapsed} should be at least {seconds_to_wait * (max_calls - 1)} seconds"
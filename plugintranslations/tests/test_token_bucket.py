@@ -0,0 +1,24 @@
+import time
+from plugintranslations.throttle import TokenBucket
+
+
+class TestTokenBucket():
+
+    def test_burst(self):
+
+        capacity = 3
+        refill_per_second = 10
+
+        @TokenBucket(capacity=capacity, refill_per_second=refill_per_second)
+        def test_function():
+            return "Function executed"
+
+        start = time.monotonic()
+        for _ in range(capacity):
+            assert test_function() == "Function executed"
+        burst_elapsed = time.monotonic() - start
+        assert burst_elapsed < 1 / refill_per_second, f"Burst of {capacity} calls should not wait, took {burst_elapsed} seconds"
+
+        test_function()
+        elapsed = time.monotonic() - start
+        assert elapsed >= 1 / refill_per_second * 0.9, f"Call after burst should wait for a token, took {elapsed} seconds"
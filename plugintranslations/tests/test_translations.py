@@ -0,0 +1,32 @@
+from plugintranslations.translations import Translations
+from plugintranslations.consts import (
+    EN_US,
+    ES_ES,
+)
+
+
+class TestTranslations():
+
+    def test_add_translation_keeps_first(self):
+        translations = Translations()
+
+        translations.add_translation(EN_US, 'Bonjour', 'Hello')
+        translations.add_translation(EN_US, 'Bonjour', 'Hi')
+
+        assert translations.get_translations('Bonjour') == {EN_US: 'Hello'}
+
+    def test_add_bulk(self):
+        translations = Translations()
+        translations.add_translation(EN_US, 'Bonjour', 'Hello')
+        translations.add_translation(EN_US, 'Merci', '')
+
+        translations.add_bulk(EN_US, {'Bonjour': 'Hi', 'Merci': 'Thanks', 'Oui': 'Yes'})
+        translations.add_bulk(ES_ES, {'Bonjour': 'Hola'})
+
+        assert 'Oui' in translations
+        assert 'Non' not in translations
+        assert translations.has(ES_ES, 'Bonjour')
+        assert not translations.has(ES_ES, 'Merci')
+        assert translations.get_translations('Bonjour') == {EN_US: 'Hello', ES_ES: 'Hola'}
+        assert translations.get_translations('Merci') == {EN_US: 'Thanks'}
+        assert translations.get_translations('Non') == {}
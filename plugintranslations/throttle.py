@@ -1,30 +1,45 @@
+import threading
 import time
 from functools import wraps
 
 
-class Throttle(object):
+class TokenBucket(object):
     """
-    Decorator that prevents a function from being called more than once every time period.
+    Decorator that limits calls of a function to `refill_per_second` on average, allowing bursts of up to `capacity` calls.
     """
 
-    def __init__(self, seconds: float = 0.1):
-        time.monotonic()
-        self.throttle_period = seconds
-        self.time_of_last_call = 0.0
+    def __init__(self, capacity: int = 1, refill_per_second: float = 10.0):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        # bucket starts full, so no need to read the clock before the first call
+        self.tokens = float(capacity)
+        self.last_refill = 0.0
+        self._lock = threading.Lock()
 
     def __call__(self, fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            now = time.monotonic()
-            time_since_last_call = now - self.time_of_last_call
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_per_second)
+                self.last_refill = now
+                # take a token; if none is available the bucket goes in debt and the caller waits until it is refilled
+                self.tokens -= 1
+                wait_seconds = -self.tokens / self.refill_per_second if self.tokens < 0 else 0.0
 
-            if time_since_last_call > self.throttle_period:
-                self.time_of_last_call = now
-            else:
-                wait_seconds = self.throttle_period - time_since_last_call
+            if wait_seconds > 0:
                 time.sleep(wait_seconds)
-                self.time_of_last_call = time.monotonic()
 
             return fn(*args, **kwargs)
 
         return wrapper
+
+
+class Throttle(TokenBucket):
+    """
+    Decorator that prevents a function from being called more than once every time period.
+    """
+
+    def __init__(self, seconds: float = 0.1):
+        super().__init__(capacity=1, refill_per_second=1 / seconds)
+        self.throttle_period = seconds
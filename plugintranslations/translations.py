@@ -1,28 +1,28 @@
-from .prompt import Prompt
-
-
 class Translations():
 
     def __init__(self) -> None:
-        self._translation: dict[str, Prompt] = {}
+        # translations by language then by text
+        self._translations: dict[str, dict[str, str]] = {}
 
     def add_translation(self, language, text, new_translation):
-        if text not in self._translation:
-            # new text, save it with current translation
-            new_prompt = Prompt(text)
-            new_prompt.set_translation(language, new_translation)
-            self._translation[text] = new_prompt
-        elif not self._translation[text].has_translation(language):
-            # not yet translate, save this one
-            self._translation[text].set_translation(language, new_translation)
-        elif self._translation[text].get_translation(language) != new_translation:
-            pass
-            # print(f"2 differents translations for '{text}', keeping first one: '{self._translation[text].get_translation(language)}' <> '{new_translation}'")
+        translations = self._translations.setdefault(language, {})
+        if not translations.get(text):
+            # new text or not yet translated, save this one
+            translations[text] = new_translation
+        # else keep first translation found
+
+    def add_bulk(self, language, new_translations: dict[str, str]):
+        translations = self._translations.setdefault(language, {})
+        if len(translations) == 0:
+            translations.update(new_translations)
         else:
-            pass  # all fine, we found twice the same text and same translation
+            translations.update({text: tr for text, tr in new_translations.items() if not translations.get(text)})
+
+    def has(self, language, text):
+        return self._translations.get(language, {}).get(text, '') != ''
 
     def __contains__(self, text):
-        return text in self._translation
+        return any(text in translations for translations in self._translations.values())
 
     def get_translations(self, text):
-        return self._translation[text].get_translations() if text in self._translation else {}
+        return {language: translations[text] for language, translations in self._translations.items() if text in translations}
@@ -3,16 +3,30 @@ import logging
 import os
 from pathlib import Path
 import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 import deepl
 
-from .throttle import Throttle
+try:
+    import ijson
+except ImportError:
+    ijson = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .throttle import TokenBucket
 
 from .version import VERSION
 from .source_file import SourceFile
 from .consts import (
-    ALL_LANGUAGES,
+    ALL_LANGUAGES_SET,
     CORE_ROOT,
+    DEEPL_BATCH_SIZE,
+    DEEPL_BURST,
+    DEEPL_CALLS_PER_SECOND,
     FR_FR,
     INPUT_DEBUG,
     INPUT_DEEPL_API_KEY,
@@ -22,17 +36,50 @@ from .consts import (
     INPUT_SOURCE_LANGUAGE,
     INPUT_TARGET_LANGUAGES,
     INPUT_USE_CORE_TRANSLATIONS,
+    JSON_STREAMING_MIN_SIZE,
     LANGUAGES_TO_DEEPL,
     LANGUAGES_TO_DEEPL_GLOSSARY,
     LOG_FORMAT,
     PLUGIN_DIRS,
     PLUGIN_INFO_JSON,
     PLUGIN_ROOT,
+    PROCESS_POOL_MIN_FILES,
     TRANSLATIONS_FILES_PATH
 )
 from .translations import Translations
 
 
+def _json_loads(content: bytes):
+    # orjson is optional, fallback on standard json module if not installed
+    return orjson.loads(content) if orjson is not None else json.loads(content)
+
+
+_BOOLEAN_INPUT_ERROR = 'Input does not meet specifications: {name}.\n Support boolean input list: "true | false" (case insensitive)'
+_FILE_EXTS_TUPLE = tuple(FILE_EXTS)
+_JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError) if ijson is not None else (json.JSONDecodeError,)
+
+
+def _iter_translations_file(file: Path):
+    # yield (path, prompts) from a translations file, big files are streamed with ijson (if installed) to limit memory usage
+    if ijson is not None and file.stat().st_size > JSON_STREAMING_MIN_SIZE:
+        with file.open('rb') as f:
+            yield from ijson.kvitems(f, '')
+    else:
+        yield from _json_loads(file.read_bytes()).items()
+
+
+def _iter_source_files(dir: str, relative_dir: str):
+    # yield (absolute path, path relative to plugin root) of all source files found under dir, except translations files
+    with os.scandir(dir) as entries:
+        for entry in entries:
+            relative_path = f"{relative_dir}/{entry.name}"
+            if entry.is_dir(follow_symlinks=False):
+                if not f"/{relative_path}".endswith(f"/{TRANSLATIONS_FILES_PATH}"):
+                    yield from _iter_source_files(entry.path, relative_path)
+            elif entry.name.endswith(_FILE_EXTS_TUPLE) and entry.name != 'info.json':
+                yield entry.path, relative_path
+
+
 class PluginTranslator():
 
     def __init__(self, cwd: Path = Path.cwd()) -> None:
@@ -42,6 +89,9 @@ class PluginTranslator():
         self.__existing_translations = Translations()
         self.__source_language: str
         self.__target_languages: list[str] = []
+        self.__source_lang_deepl: str
+        self.__source_lang_deepl_glossary: str
+        self.__target_lang_deepl: dict[str, str] = {}
         self.__include_empty_translation: bool = False
         self.__use_core_translations: bool = True
         self.__generate_source_language_translations: bool = False
@@ -55,9 +105,12 @@ class PluginTranslator():
         self.__deepl_translator: deepl.Translator | None = None
         self.__deepl_api_key: str | None = None
         self.__api_call_counter = 0
+        self.__deepl_cache: dict[tuple[str, str], str] = {}
+        self.__lock = threading.Lock()
 
         self.__info_json_file: Path = self.__plugin_root/PLUGIN_INFO_JSON
         self.__info_json_content: dict | None = None
+        self.__info_json_hash: bytes | None = None
 
         self.__get_inputs()
         self.__read_info_json()
@@ -69,6 +122,7 @@ class PluginTranslator():
     def __del__(self):
         if self.__deepl_translator is None:
             return
+        self.__deepl_translator.close()
 
     @property
     def deepl_translator(self):
@@ -101,8 +155,11 @@ class PluginTranslator():
 
     def __get_inputs(self):
 
-        self.__source_language = self._get_input_in_list(INPUT_SOURCE_LANGUAGE, ALL_LANGUAGES)
-        self.__target_languages = self._get_list_input(INPUT_TARGET_LANGUAGES, ALL_LANGUAGES)
+        self.__source_language = self._get_input_in_list(INPUT_SOURCE_LANGUAGE, ALL_LANGUAGES_SET)
+        self.__target_languages = self._get_list_input(INPUT_TARGET_LANGUAGES, ALL_LANGUAGES_SET)
+        self.__source_lang_deepl = LANGUAGES_TO_DEEPL[self.__source_language]
+        self.__source_lang_deepl_glossary = LANGUAGES_TO_DEEPL_GLOSSARY[self.__source_language]
+        self.__target_lang_deepl = {lang: LANGUAGES_TO_DEEPL[lang] for lang in self.__target_languages}
         self.__deepl_api_key = self._get_input(INPUT_DEEPL_API_KEY)
         self.__include_empty_translation = self._get_boolean_input(INPUT_INCLUDE_EMPTY_TRANSLATION)
         if self.__source_language != FR_FR:
@@ -130,42 +187,55 @@ class PluginTranslator():
 
     def _get_boolean_input(self, name: str):
         val = self._get_input(name)
-        trueValue = ['true', 'True', 'TRUE']
-        falseValue = ['false', 'False', 'FALSE']
-        if val in trueValue:
+        val = val.lower() if val is not None else val
+        if val == 'true':
             return True
-        elif val in falseValue:
+        elif val == 'false':
             return False
         else:
-            raise ValueError(f'Input does not meet specifications: {name}.\n Support boolean input list: "true | True | TRUE | false | False | FALSE"')
+            raise ValueError(_BOOLEAN_INPUT_ERROR.format(name=name))
 
-    def _get_list_input(self, name: str, allowed_values: list):
+    def _get_list_input(self, name: str, allowed_values: frozenset[str]):
         val = self._get_input(name)
         if val is None:
             raise ValueError(f'Input does not meet specifications: {name}.\n {name} is required')
         list = [s.strip() for s in val.split(',')]
         for s in list:
             if s not in allowed_values:
-                raise ValueError(f'Input does not meet specifications: {name}.\n {s} not in list: {allowed_values}')
+                raise ValueError(f'Input does not meet specifications: {name}.\n {s} not in list: {sorted(allowed_values)}')
         return list
 
-    def _get_input_in_list(self, name: str, allowed_values: list):
+    def _get_input_in_list(self, name: str, allowed_values: frozenset[str]):
         val = self._get_input(name)
         if val is None or val not in allowed_values:
-            raise ValueError(f'Input does not meet specifications: {name}.\n {val} not in list: {allowed_values}')
+            raise ValueError(f'Input does not meet specifications: {name}.\n {val} not in list: {sorted(allowed_values)}')
         return val
 
     def __read_info_json(self):
         if not self.__info_json_file.is_file():
             raise RuntimeError("Missing info.json file")
-        self.__info_json_content = json.loads(self.__info_json_file.read_text(encoding="UTF-8"))
+        raw_content = self.__info_json_file.read_bytes()
+        self.__info_json_hash = hashlib.md5(raw_content).digest()
+        self.__info_json_content = _json_loads(raw_content)
 
     def __write_info_json(self):
         if self.__info_json_content is None:
             self.__logger.warning("No info.json content to write, skipping...")
             return
-        self.__info_json_content['language'] = sorted(set([self.__source_language] + self.__target_languages))
-        self.__info_json_file.write_text(json.dumps(self.__info_json_content, ensure_ascii=False, indent='\t'), encoding="UTF-8")
+        # keep languages order from info.json, languages not yet listed are appended
+        current_languages = self.__info_json_content.get('language', [])
+        wanted_languages = dict.fromkeys([self.__source_language] + self.__target_languages)
+        languages = [lang for lang in current_languages if lang in wanted_languages]
+        languages += [lang for lang in wanted_languages if lang not in languages]
+        if languages != current_languages:
+            self.__info_json_content['language'] = languages
+        new_content = json.dumps(self.__info_json_content, ensure_ascii=False, indent='\t').encode("UTF-8")
+        new_hash = hashlib.md5(new_content).digest()
+        if new_hash == self.__info_json_hash:
+            self.__logger.debug("info.json is unchanged, skipping write")
+            return
+        self.__info_json_file.write_bytes(new_content)
+        self.__info_json_hash = new_hash
 
     def __create_deepl_glossaries(self, deepl_translator: deepl.Translator):
         fileDir = Path(__file__).parent
@@ -173,74 +243,97 @@ class PluginTranslator():
         if not glossary_file.exists():
             return
 
-        str_entries = glossary_file.read_text(encoding="UTF-8")
-        md5_hash = hashlib.md5(str_entries.encode('utf-8')).hexdigest()
-        entries = json.loads(str_entries)
+        with glossary_file.open('rb') as f:
+            md5_hash = hashlib.file_digest(f, 'md5').hexdigest()
+        entries: dict | None = None
         deepl_glossaries = deepl_translator.list_glossaries()
 
         for target_language in self.__target_languages:
-            if target_language == self.__source_language or target_language not in entries:
+            if target_language == self.__source_language:
                 continue
+            existing_glossaries = [g for g in deepl_glossaries if g.source_lang == self.__source_lang_deepl_glossary
+                                   and g.target_lang == LANGUAGES_TO_DEEPL_GLOSSARY[target_language]]
+            # glossary file content is only needed if there is no up-to-date glossary on deepl side
+            if not any(g.name == md5_hash for g in existing_glossaries):
+                if entries is None:
+                    entries = _json_loads(glossary_file.read_bytes())
+                if target_language not in entries:
+                    continue
             self.__logger.info(f"Check glossary {self.__source_language}=>{target_language}")
 
-            for deepl_glossary in deepl_glossaries:
-                if deepl_glossary.source_lang == LANGUAGES_TO_DEEPL_GLOSSARY[self.__source_language] and deepl_glossary.target_lang == LANGUAGES_TO_DEEPL_GLOSSARY[target_language]:
-                    if deepl_glossary.name == md5_hash:
-                        self.__logger.info("Already exists")
-                        self.__glossary[target_language] = deepl_glossary
-                    else:
-                        self.__logger.info(f"Delete existing old glossary {deepl_glossary.name}")
-                        deepl_translator.delete_glossary(deepl_glossary)
+            for deepl_glossary in existing_glossaries:
+                if deepl_glossary.name == md5_hash:
+                    self.__logger.info("Already exists")
+                    self.__glossary[target_language] = deepl_glossary
+                else:
+                    self.__logger.info(f"Delete existing old glossary {deepl_glossary.name}")
+                    deepl_translator.delete_glossary(deepl_glossary)
             if self.__glossary[target_language] is None:
                 self.__logger.info(f"Create new glossary {md5_hash}")
-                self.__glossary[target_language] = deepl_translator.create_glossary(md5_hash, source_lang=LANGUAGES_TO_DEEPL_GLOSSARY[self.__source_language],
+                self.__glossary[target_language] = deepl_translator.create_glossary(md5_hash, source_lang=self.__source_lang_deepl_glossary,
                                                                                     target_lang=LANGUAGES_TO_DEEPL_GLOSSARY[target_language], entries=entries[target_language])
 
     def find_prompts_in_all_files(self):
         self.__logger.info("Find prompts in all plugin files")
+        files: list[tuple[str, Path]] = []
         for dir in PLUGIN_DIRS:
             plugin_dir = self.__plugin_root/dir
-            for root, dirs, files in plugin_dir.walk():
-                for dirname in dirs:
-                    if root.name == "core" and dirname == 'i18n':
-                        dirs.remove(dirname)
-
-                for file in files:
-                    if file == 'info.json':
-                        continue
-                    filename = Path(file)
-                    if filename.suffix in FILE_EXTS:
-                        absolute_file_path = root/filename
-                        jeedom_file_path = absolute_file_path.relative_to(self.__plugin_root)
-                        jeedom_file_path = (f"plugins/{self.plugin_id}"/jeedom_file_path).as_posix()
-                        self.__logger.info(f"    {jeedom_file_path}...")
-                        self.__files[jeedom_file_path] = SourceFile(absolute_file_path, self.__logger)
-                        self.__files[jeedom_file_path].search_prompts()
+            if not plugin_dir.is_dir():
+                continue
+            for absolute_file_path, relative_file_path in _iter_source_files(str(plugin_dir), dir):
+                files.append((f"plugins/{self.plugin_id}/{relative_file_path}", Path(absolute_file_path)))
+
+        absolute_file_paths = [absolute_file_path for _, absolute_file_path in files]
+        if len(files) >= PROCESS_POOL_MIN_FILES:
+            # scanning files is cpu bound, spread it over all cores for big plugins
+            with ProcessPoolExecutor() as executor:
+                all_extracted = list(executor.map(SourceFile.extract_prompts, absolute_file_paths, chunksize=16))
+        else:
+            all_extracted = map(SourceFile.extract_prompts, absolute_file_paths)
+
+        # messages are logged by main process, after the corresponding file name
+        for (jeedom_file_path, absolute_file_path), extracted in zip(files, all_extracted):
+            self.__logger.info(f"    {jeedom_file_path}...")
+            self.__files[jeedom_file_path] = SourceFile(absolute_file_path, self.__logger)
+            self.__files[jeedom_file_path].add_extracted_prompts(extracted)
 
     def do_translate(self):
         self.__logger.info("Find existing translations...")
+        # same text can be found in several files, translate each one only once
+        unique_texts = dict.fromkeys(prompt.get_text() for file in self.__files.values() for prompt in file.get_prompts().values())
+
+        if self.deepl_translator is not None:
+            # texts without existing translation (plugin & core), per target language
+            missing = {}
+            for target_language in self.__target_languages:
+                if target_language == self.__source_language:
+                    continue
+                texts = [text for text in unique_texts if not self.__existing_translations.has(target_language, text)]
+                if len(texts) > 0:
+                    missing[target_language] = texts
+
+            if len(missing) > 0:
+                # make call to deepl translator for any missing translations, one thread per target language
+                with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+                    futures = [executor.submit(self.__translate_missing, target_language, texts) for target_language, texts in missing.items()]
+                    for future in futures:
+                        future.result()
+
         for file in self.__files.values():
             for prompt in file.get_prompts().values():
-                # first get translations from existing translations (plugin & core) if exists
-                if prompt.get_text() in self.__existing_translations:
-                    tr = self.__existing_translations.get_translations(prompt.get_text())
-                    # self._logger.info(f"find translation for {prompt.get_text()} => {tr}")
-                    prompt.set_translations(tr)
-
+                prompt.set_translations(self.__existing_translations.get_translations(prompt.get_text()))
                 # make sure to store text as a target translation for source language
                 prompt.set_translation(self.__source_language, prompt.get_text())
-
-                if self.deepl_translator is not None:
-                    # make call to deepl translator for any missing translations
-                    for target_language in self.__target_languages:
-                        if target_language == self.__source_language:
-                            continue
-                        if not prompt.has_translation(target_language):
-                            tr = self.transalte_with_deepl(prompt.get_text(), target_language)
-                            prompt.set_translation(target_language, tr)
-                            self.__existing_translations.add_translation(target_language, prompt.get_text(), tr)
         self.__logger.info(f"Number of api call done: {self.__api_call_counter}")
 
+    def __translate_missing(self, target_language: str, texts: list[str]):
+        for i in range(0, len(texts), DEEPL_BATCH_SIZE):
+            batch = texts[i:i + DEEPL_BATCH_SIZE]
+            translations = self.translate_batch_with_deepl(batch, target_language)
+            with self.__lock:
+                for text, tr in zip(batch, translations):
+                    self.__existing_translations.add_translation(target_language, text, tr)
+
     def translate_info_json(self):
         if self.deepl_translator is None:
             return
@@ -259,35 +352,56 @@ class PluginTranslator():
             return
         source_desc = descriptions[self.__source_language]
 
+        missing_languages = []
         for target_language in self.__target_languages:
             if target_language in descriptions and descriptions[target_language] != '':
                 self.__logger.debug(f"Translation of description for {target_language} already exists, skipping...")
                 continue
-            descriptions[target_language] = self.transalte_with_deepl(source_desc, target_language)
+            missing_languages.append(target_language)
+
+        if len(missing_languages) > 0:
+            with ThreadPoolExecutor(max_workers=len(missing_languages)) as executor:
+                translations = executor.map(lambda target_language: self.transalte_with_deepl(source_desc, target_language), missing_languages)
+                for target_language, translation in zip(missing_languages, translations):
+                    descriptions[target_language] = translation
 
         self.__info_json_content['description'] = descriptions
 
-    @Throttle(seconds=0.1)
     def transalte_with_deepl(self, text: str, target_language: str) -> str:
+        return self.translate_batch_with_deepl([text], target_language)[0]
+
+    def translate_batch_with_deepl(self, texts: list[str], target_language: str) -> list[str]:
         if self.__deepl_translator is None:
-            return ''
-
-        self.__logger.debug(f"call deepl to translate {text} in {target_language}")
-        self.__api_call_counter += 1
-        result = self.__deepl_translator.translate_text(
-            text,
-            source_lang=LANGUAGES_TO_DEEPL[self.__source_language],
-            target_lang=LANGUAGES_TO_DEEPL[target_language],
+            return [''] * len(texts)
+
+        # only call deepl for texts not yet translated during this run
+        missing = [text for text in dict.fromkeys(texts) if (text, target_language) not in self.__deepl_cache]
+        if len(missing) > 0:
+            for text, tr in zip(missing, self.__call_deepl(missing, target_language)):
+                if tr != '':
+                    self.__deepl_cache[(text, target_language)] = tr
+
+        return [self.__deepl_cache.get((text, target_language), '') for text in texts]
+
+    @TokenBucket(capacity=DEEPL_BURST, refill_per_second=DEEPL_CALLS_PER_SECOND)
+    def __call_deepl(self, texts: list[str], target_language: str) -> list[str]:
+        self.__logger.debug(f"call deepl to translate {len(texts)} texts in {target_language}")
+        with self.__lock:
+            self.__api_call_counter += 1
+        results = self.__deepl_translator.translate_text(
+            texts,
+            source_lang=self.__source_lang_deepl,
+            target_lang=self.__target_lang_deepl[target_language],
             preserve_formatting=True,
             context='home automation',
             glossary=self.__glossary[target_language],
             model_type='prefer_quality_optimized'
         )
-        if not isinstance(result, deepl.TextResult):
-            self.__logger.error(f"Unexpected result type: {type(result)}")
-            return ''
+        if not isinstance(results, list) or len(results) != len(texts):
+            self.__logger.error(f"Unexpected result type: {type(results)}")
+            return [''] * len(texts)
 
-        return result.text
+        return [result.text for result in results]
 
     def get_plugin_translations(self):
         self.__logger.info("Read plugin translations file...")
@@ -306,13 +420,17 @@ class PluginTranslator():
             if not file.exists():
                 self.__logger.info(f"file {file.as_posix()} not found !?")
                 continue
+            paths_read = 0
             try:
-                data = json.loads(file.read_text(encoding="UTF-8"))
-                for path in data:
-                    for text in data[path]:
-                        self.__existing_translations.add_translation(language, text, data[path][text])
-            except json.JSONDecodeError as e:
-                self.__logger.error(f"Error while reading {file.as_posix()}: {e}")
+                for _, prompts in _iter_translations_file(file):
+                    self.__existing_translations.add_bulk(language, prompts)
+                    paths_read += 1
+            except _JSON_ERRORS as e:
+                if paths_read > 0:
+                    # big files are streamed, translations found before the error are already loaded
+                    self.__logger.error(f"Error while reading {file.as_posix()}: {e}; translations of the first {paths_read} paths are kept")
+                else:
+                    self.__logger.error(f"Error while reading {file.as_posix()}: {e}")
 
     def write_plugin_translations(self):
         self.__logger.info("Write translations files...")
@@ -334,4 +452,8 @@ class PluginTranslator():
 
             if (len(language_result) > 0):
                 self.__logger.info(f"Will dump {translation_file.as_posix()}")
-                translation_file.write_text(json.dumps(language_result, ensure_ascii=False, sort_keys=True, indent=4).replace('/', r'\/'), encoding="UTF-8")
+                content = json.dumps(language_result, ensure_ascii=False, sort_keys=True, indent=4).replace('/', r'\/')
+                # write to a temporary file first so an existing translation file is never left truncated
+                tmp_file = translation_file.with_suffix('.json.tmp')
+                tmp_file.write_text(content, encoding="UTF-8")
+                tmp_file.replace(translation_file)